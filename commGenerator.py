@@ -3,9 +3,13 @@ import sys
 import math
 import json
 import networkit as nk
+import numpy as np
 from graphGenerators import *
 from metrics import *
 import random
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from statistics import NormalDist
 
 def mkdir_if_not_exists(path):
     if not os.path.exists(path):
@@ -16,17 +20,19 @@ def compute_rmat_scale(num_vertices):
     """Return smallest scale such that 2^scale >= num_vertices."""
     return int(math.ceil(math.log2(num_vertices)))
 
-def _sample_trunc_normal_01(mean_01: float, sigma: float, rng=random, max_tries: int = 50) -> float:
+def _sample_trunc_normal_01(mean_01: float, sigma: float, size: int, rng):
     """
-    Sample from N(mean_01, sigma^2) truncated to [0,1].
-    Falls back to clamping if rejection fails (rare).
+    Sample `size` values from N(mean_01, sigma^2) truncated to [0,1]
+    by inverse-CDF: map U(0,1) onto [Phi(a), Phi(b)] and invert.
     """
-    for _ in range(max_tries):
-        x = rng.gauss(mean_01, sigma)
-        if 0.0 <= x <= 1.0:
-            return x
-    # fallback: clamp
-    return max(0.0, min(1.0, rng.gauss(mean_01, sigma)))
+    std = NormalDist()
+    lo = std.cdf((0.0 - mean_01) / sigma)
+    hi = std.cdf((1.0 - mean_01) / sigma)
+
+    # Keep p strictly inside (0,1) for inv_cdf when a bound sits far in a tail
+    p = np.clip(lo + rng.random(size) * (hi - lo), np.nextafter(0.0, 1.0), np.nextafter(1.0, 0.0))
+    z = np.fromiter((std.inv_cdf(q) for q in p.tolist()), dtype=np.float64, count=size)
+    return np.clip(mean_01 + sigma * z, 0.0, 1.0)
 
 def gen_messages(number_of_processes, average_communication_degree, communication_skew):
     scale = compute_rmat_scale(number_of_processes)
@@ -44,13 +50,68 @@ def gen_messages(number_of_processes, average_communication_degree, communicatio
 
 def sample_distinct_from_range(rng, start, size, sample_size):
     if size <= 0:
-        return []
+        return np.empty(0, dtype=np.int64)
 
     # Ensure valid integer sample size
     sample_size = int(sample_size)
     sample_size = max(0, min(sample_size, size))
 
-    return rng.sample(range(start, start + size), sample_size)
+    # Generator.choice switches to Floyd's algorithm internally when
+    # sample_size << size; order is irrelevant to callers, so skip the shuffle
+    return start + rng.choice(size, size=sample_size, replace=False, shuffle=False)
+
+def _parallel_draw(seed, size, draw, chunk_size=1 << 20):
+    """
+    Draw `size` variates as fixed-size chunks, each from its own Philox
+    substream (jumped(i) for chunk i), filled by a thread pool. NumPy releases
+    the GIL while drawing, and the result for a given seed does not depend
+    on the number of threads.
+    """
+    bit_generator = np.random.Philox(seed)
+    if size <= chunk_size:
+        return draw(np.random.Generator(bit_generator), size)
+
+    chunk_sizes = [min(chunk_size, size - lo) for lo in range(0, size, chunk_size)]
+    gens = [np.random.Generator(bit_generator.jumped(i)) for i in range(len(chunk_sizes))]
+
+    with ThreadPoolExecutor(max_workers=min(len(gens), os.cpu_count() or 1)) as pool:
+        return np.concatenate(list(pool.map(draw, gens, chunk_sizes)))
+
+@lru_cache(maxsize=None)
+def _make_volume_kernel(mode, skew, heavy_tail, max_volume):
+    """
+    Build a draw function (gen, n) -> int64 volumes in [1, max_volume] for one
+    configuration. Mode and tail branches are resolved once here, and the
+    derived constants are bound into the returned closure.
+    """
+    span = max_volume - 1
+
+    if mode == "power":
+        k = max(1e-6, skew)
+        if heavy_tail:
+            def kernel(gen, n):
+                x = gen.random(n)  # U(0,1)
+                return 1 + ((1.0 - (1.0 - x) ** k) * span).astype(np.int64)   # pushes toward 1
+        else:
+            def kernel(gen, n):
+                x = gen.random(n)  # U(0,1)
+                return 1 + (x ** k * span).astype(np.int64)                    # pushes toward 0
+        return kernel
+
+    if mode == "lognormal":
+        # skew controls sigma; larger sigma => more skew
+        sigma = max(1e-6, skew)
+        # cap to avoid insane outliers
+        cap = 50.0
+        step = span / cap
+
+        def kernel(gen, n):
+            # mu chosen so median ~ 1 before scaling; we'll scale after if target_mean given
+            x = gen.lognormal(mean=0.0, sigma=sigma, size=n)
+            return 1 + (np.minimum(x, cap) * step).astype(np.int64)
+        return kernel
+
+    raise ValueError("mode must be 'power', 'lognormal'")
 
 def gen_message_volumes(
     G,
@@ -61,60 +122,57 @@ def gen_message_volumes(
     target_mean=None,      # optional: enforce average approx
     seed=None
 ):
-    rng = random.Random(seed)
+    # Collect edges once; NetworKit's iterator is the only per-edge Python work
+    edges = np.fromiter(G.iterEdges(), dtype=[("u", np.int32), ("v", np.int32)])
+    m = len(edges)
 
     # First pass: sample unscaled volumes in [1, max_volume]
-    raw = []
-    edges = []
-    for u, v in G.iterEdges():
-        edges.append((u, v))
-
-        if mode == "power":
-            x = rng.random()  # U(0,1)
-            k = max(1e-6, float(skew))
-            if heavy_tail:
-                x = 1.0 - (1.0 - x) ** k   # pushes toward 1
-            else:
-                x = x ** k                  # pushes toward 0
-
-            vol = 1 + int(x * (max_volume - 1))
-
-        elif mode == "lognormal":
-            # skew controls sigma; larger sigma => more skew
-            sigma = max(1e-6, float(skew))
-            # mu chosen so median ~ 1 before scaling; we'll scale after if target_mean given
-            x = rng.lognormvariate(mu=0.0, sigma=sigma)
-            vol = 1 + int(min(x, 50.0) / 50.0 * (max_volume - 1))  # cap to avoid insane outliers
-
-        else:
-            raise ValueError("mode must be 'power', 'lognormal'")
-
-        raw.append(vol)
+    kernel = _make_volume_kernel(mode, float(skew), bool(heavy_tail), int(max_volume))
+    raw = _parallel_draw(seed, m, kernel)
 
     # Optional: rescale to hit an approximate target mean while respecting [1, max_volume]
-    if target_mean is not None and raw:
-        cur_mean = sum(raw) / len(raw)
+    if target_mean is not None and m:
+        cur_mean = raw.mean()
         if cur_mean > 0:
             scale = float(target_mean) / cur_mean
-            raw = [max(1, min(max_volume, int(round(vol * scale)))) for vol in raw]
+            raw = np.clip(np.rint(raw * scale), 1, max_volume).astype(np.int64)
 
     # Apply weights
-    for (u, v), vol in zip(edges, raw):
+    for u, v, vol in zip(edges["u"].tolist(), edges["v"].tolist(), raw.tolist()):
         G.setWeight(u, v, vol)
         # print(f"Message from {u} to {v}: Volume = {vol}")
 
     return G
 
+def comm_graph_to_csr(G):
+    """
+    Extract a directed, weighted communication graph into CSR arrays
+    (indptr, indices, weights), with each row's columns sorted ascending.
+    Row u holds the messages sent by process u.
+    """
+    edges = np.fromiter(
+        G.iterEdgesWeights(),
+        dtype=[("u", np.int64), ("v", np.int64), ("w", np.float64)],
+    )
+    n = G.upperNodeIdBound()
+
+    order = np.lexsort((edges["v"], edges["u"]))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edges["u"], minlength=n), out=indptr[1:])
+
+    return indptr, edges["v"][order], edges["w"][order].astype(np.int64)
+
 def initialize_graph(
-    G_directed_comm,
+    comm_csr,
     mean_position: float = 0.0,  # [-1, 1]: -1 -> min, 0 -> mid, +1 -> max
     skew: float = 0.5,           # >=0: controls stddev/spread (bigger => more variance)
     seed: int | None = None,
 ):
-    rng = random.Random(seed)
+    rng = np.random.default_rng(seed)
 
-    number_of_processes = G_directed_comm.numberOfNodes()
-    part_sizes = [0 for _ in range(number_of_processes)]
+    indptr, _, weights = comm_csr
+    number_of_processes = len(indptr) - 1
+    part_sizes = np.zeros(number_of_processes, dtype=np.int64)
 
     # Map mean_position [-1,1] -> mean in [0,1]
     mean_position = max(-1.0, min(1.0, float(mean_position)))
@@ -127,50 +185,95 @@ def initialize_graph(
     skew = max(0.0, float(skew))
     sigma = 0.02 + 0.25 * skew   # tweakable but behaves well
 
-    for u in G_directed_comm.iterNodes():
-        # For directed graphs, iterNeighbors(u) = out-neighbors in NetworKit
-        outgoing_weights = [G_directed_comm.weight(u, v) for v in G_directed_comm.iterNeighbors(u)]
-
-        if outgoing_weights:
-            min_weight = min(outgoing_weights)
-            max_weight = sum(outgoing_weights)
-
-            if max_weight <= min_weight:
-                part_sizes[u] = int(min_weight)
-            else:
-                x = _sample_trunc_normal_01(mean_01, sigma, rng=rng)
-                part_sizes[u] = int(min_weight + x * (max_weight - min_weight))
-        else:
-            #print(f"Warning: Process {u} has no outgoing communication; assigning partition size 0.")
-            part_sizes[u] = 0
-
-    total_vertices = sum(part_sizes)
+    # Per-source min and sum of outgoing weights over the CSR rows.
+    # Processes with no outgoing communication keep partition size 0.
+    senders = np.flatnonzero(np.diff(indptr))
+    if len(senders):
+        starts = indptr[senders]
+        min_weight = np.minimum.reduceat(weights, starts)
+        max_weight = np.add.reduceat(weights, starts)
+
+        x = _sample_trunc_normal_01(mean_01, sigma, len(senders), rng)
+        part_sizes[senders] = np.where(
+            max_weight <= min_weight,
+            min_weight,
+            min_weight + x * (max_weight - min_weight),
+        ).astype(np.int64)
+
+    total_vertices = int(part_sizes.sum())
     G_init = nk.Graph(total_vertices, directed=False)
 
     return G_init, part_sizes
 
-def generate_edges(G_init, part_sizes, G_directed_comm, edge_connection_prob=0.5, seed=None):
-    offset = 0
-    part_offsets = []
-    for size in part_sizes:
-        part_offsets.append(offset)
-        offset += size
-    
-    processed_pairs = set()
-    rng = random.Random(seed) 
-    for u in G_directed_comm.iterNodes():
-        start_u = part_offsets[u]
-        size_u = part_sizes[u]
-
-        for v in G_directed_comm.iterNeighbors(u):
-            if (u, v) in processed_pairs or (v, u) in processed_pairs:
+def _connect_samples(rng, sampled_vertices_u, sampled_vertices_v, edge_connection_prob):
+    """
+    Connect two vertex samples in a bipartite manner and return the edges as
+    (src, dst) arrays. Every vertex in both samples gets at least one edge.
+    """
+    num_u = len(sampled_vertices_u)
+    num_v = len(sampled_vertices_v)
+
+    # Additional edges based on edge_connection_prob, then force at least
+    # one connection for every sampled vertex of u and of v. Marking all
+    # edges on one grid yields each (su, sv) pair at most once.
+    mask = rng.random((num_u, num_v)) < edge_connection_prob
+    mask[np.arange(num_u), rng.integers(0, num_v, size=num_u)] = True
+    mask[rng.integers(0, num_u, size=num_v), np.arange(num_v)] = True
+    ii, jj = np.nonzero(mask)
+
+    return sampled_vertices_u[ii], sampled_vertices_v[jj]
+
+def generate_edges(G_init, part_sizes, comm_csr, edge_connection_prob=0.5, seed=None):
+    part_sizes = np.asarray(part_sizes, dtype=np.int64)
+    part_offsets = np.concatenate(([0], np.cumsum(part_sizes[:-1])))
+
+    # Python ints for the scalar lookups in the per-pair loop below
+    size_list = part_sizes.tolist()
+    offset_list = part_offsets.tolist()
+
+    src_chunks = []
+    dst_chunks = []
+    rng = np.random.default_rng(seed)
+
+    indptr, indices, weights = comm_csr
+    n = len(indptr) - 1
+    if len(indices) == 0:
+        return G_init
+
+    # Reverse volume w(v, u) for every CSR entry (u, v). CSR order sorts the
+    # keys u * n + v ascending, so one searchsorted over all of them suffices.
+    rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+    keys = rows * n + indices
+    reverse_keys = indices * n + rows
+    pos = np.minimum(np.searchsorted(keys, reverse_keys), len(keys) - 1)
+    has_reverse_all = keys[pos] == reverse_keys
+    reverse_weights = np.where(has_reverse_all, weights[pos], 0)
+
+    row_bounds = indptr.tolist()
+    for u in range(n):
+        start_u = offset_list[u]
+        size_u = size_list[u]
+        row_lo, row_hi = row_bounds[u], row_bounds[u + 1]
+
+        prev_v = -1
+        for v, send_vol_uv, send_vol_vu, has_reverse in zip(
+            indices[row_lo:row_hi].tolist(),
+            weights[row_lo:row_hi].tolist(),
+            reverse_weights[row_lo:row_hi].tolist(),
+            has_reverse_all[row_lo:row_hi].tolist(),
+        ):
+            # Rows are sorted, so repeated (u, v) entries are adjacent
+            if v == prev_v:
+                continue
+            prev_v = v
+
+            # Each pair is handled once from its smaller endpoint; a pair
+            # only present as (u, v) with v < u has no other side to skip to
+            if v < u and has_reverse:
                 continue
-            processed_pairs.add((u, v))
 
-            send_vol_uv = G_directed_comm.weight(u, v)
-            send_vol_vu = G_directed_comm.weight(v, u) if G_directed_comm.hasEdge(v, u) else 0
-            start_v = part_offsets[v]
-            size_v = part_sizes[v]
+            start_v = offset_list[v]
+            size_v = size_list[v]
 
             # This part should sample send_vol_uv distinct vertices from u's partition
             # and send_vol_vu distinct vertices from v's partition, and connect them
@@ -185,22 +288,13 @@ def generate_edges(G_init, part_sizes, G_directed_comm, edge_connection_prob=0.5
             sampled_vertices_u = sample_distinct_from_range(rng, start_u, size_u, sample_size_u)
             sampled_vertices_v = sample_distinct_from_range(rng, start_v, size_v, sample_size_v)
 
-            for su in sampled_vertices_u:
-                # Ensure at least one connection
-                sv = rng.choice(sampled_vertices_v)
-                G_init.addEdge(su, sv)
+            src, dst = _connect_samples(rng, sampled_vertices_u, sampled_vertices_v, edge_connection_prob)
+            src_chunks.append(src)
+            dst_chunks.append(dst)
 
-            for sv in sampled_vertices_v:
-                # Ensure at least one connection
-                su = rng.choice(sampled_vertices_u)
-                G_init.addEdge(su, sv)
-            
-            # Add additional edges based on edge_connection_prob
-            for su in sampled_vertices_u:
-                for sv in sampled_vertices_v:
-                    if not G_init.hasEdge(su, sv):
-                        if rng.random() < edge_connection_prob:
-                            G_init.addEdge(su, sv)
+    # Insert all collected edges with one bulk call on the C++ side
+    if src_chunks:
+        G_init.addEdges((np.concatenate(src_chunks), np.concatenate(dst_chunks)))
 
     return G_init
 
@@ -208,17 +302,13 @@ def remove_isolated_nodes(G, part_sizes):
     isolated_nodes = [u for u in G.iterNodes() if G.degree(u) == 0]
     for i in isolated_nodes:
         G.removeNode(i)
-    # Update part_sizes to reflect removed nodes
-    new_part_sizes = []
-    offset = 0
-    for size in part_sizes:
-        count = 0
-        for i in range(size):
-            if not G.hasNode(offset + i):
-                continue
-            count += 1
-        new_part_sizes.append(count)
-        offset += size
+    # Update part_sizes to reflect removed nodes: count surviving ids per
+    # partition range with one prefix sum (reduceat mishandles empty parts)
+    alive = np.zeros(G.upperNodeIdBound(), dtype=bool)
+    alive[np.fromiter(G.iterNodes(), dtype=np.int64)] = True
+    alive_prefix = np.concatenate(([0], np.cumsum(alive, dtype=np.int64)))
+    part_bounds = np.concatenate(([0], np.cumsum(np.asarray(part_sizes, dtype=np.int64))))
+    new_part_sizes = np.diff(alive_prefix[part_bounds])
 
     return G, new_part_sizes
 
@@ -226,7 +316,7 @@ def generate_communication(args):
     """
     Reads args.comm_config JSON and runs:
       gen_messages -> directed+weighted -> gen_message_volumes
-      -> initialize_graph -> generate_edges
+      -> comm_graph_to_csr -> initialize_graph -> generate_edges
     Returns: (G_final, part_array)
     """
     config_path = getattr(args, "comm_config", None)
@@ -264,9 +354,13 @@ def generate_communication(args):
         seed=(None if msgvol.get("seed") is None else int(msgvol["seed"])),
     )
 
+    # Extract the weighted communication pattern once for the per-process passes
+    comm_csr = comm_graph_to_csr(G_directed)
+    del G_directed
+
     # --- initialize parts / initial graph ---
     G_init, part_sizes = initialize_graph(
-        G_directed,
+        comm_csr,
         mean_position=float(initg["mean_position"]),
         skew=float(initg["skew"]),
         seed=(None if initg.get("seed") is None else int(initg["seed"])),
@@ -276,7 +370,7 @@ def generate_communication(args):
     G_final = generate_edges(
         G_init,
         part_sizes,
-        G_directed,
+        comm_csr,
         edge_connection_prob=float(edges["edge_connection_prob"]),
         seed=(None if edges.get("seed") is None else int(edges["seed"])),
     )
@@ -285,11 +379,6 @@ def generate_communication(args):
     print(f"Final graph has {G_final.numberOfNodes()} nodes and {G_final.numberOfEdges()} edges.")
 
     # Build part_array: length = total vertices
-    part_array = [0 for _ in range(G_final.numberOfNodes())]
-    offset = 0
-    for pid, size in enumerate(part_sizes):
-        for i in range(size):
-            part_array[offset + i] = pid
-        offset += size
+    part_array = np.repeat(np.arange(len(part_sizes), dtype=np.int32), part_sizes)
 
     return G_final, part_array
\ No newline at end of file
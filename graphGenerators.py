@@ -1,6 +1,9 @@
+from functools import lru_cache
+
 import networkit as nk
 
 
+@lru_cache(maxsize=1024)
 def rmat_params(skew):
     """
     Returns (a, b, c, d) for R-MAT based on a skew parameter in [0, 1].
@@ -24,9 +27,9 @@ def rmat_params(skew):
     c = c0 + (c1 - c0) * skew
     d = d0 + (d1 - d0) * skew
 
-    # Normalize for safety (sum should be 1)
-    total = a + b + c + d
-    return a/total, b/total, c/total, d/total
+    # Both endpoints sum to 1, so any convex combination does too
+    assert abs(a + b + c + d - 1.0) < 1e-12
+    return a, b, c, d
 
 def generate_rmat_graph(scale, edge_factor, a, b, c, d):
     """
@@ -1,5 +1,5 @@
 import networkit as nk
-import math
+import numpy as np
 
 
 # ----------------------------
@@ -14,21 +14,29 @@ def num_edges(G):
     return G.numberOfEdges()
 
 
+def degrees_array(G):
+    """Return int32 array: degree of each node."""
+    return np.fromiter((G.degree(u) for u in G.iterNodes()), dtype=np.int32, count=G.numberOfNodes())
+
+
 def degrees(G):
     """Return list: degree of each node."""
-    return [G.degree(u) for u in G.iterNodes()]
+    return degrees_array(G).tolist()
 
 
-def min_degree(G):
-    return min(degrees(G))
+def min_degree(G, degs=None):
+    degs = degrees_array(G) if degs is None else degs
+    return int(degs.min())
 
 
-def max_degree(G):
-    return max(degrees(G))
+def max_degree(G, degs=None):
+    degs = degrees_array(G) if degs is None else degs
+    return int(degs.max())
 
 
-def avg_degree(G):
-    return sum(degrees(G)) /  G.numberOfNodes() / 2
+def avg_degree(G, degs=None):
+    degs = degrees_array(G) if degs is None else degs
+    return float(degs.sum(dtype=np.int64)) / G.numberOfNodes() / 2
 
 
 def density(G):
@@ -74,14 +82,14 @@ def diameter_estimate(G, error=0.01):
     return diam.getDiameter()
 
 
-def degree_distribution(G):
+def degree_distribution(G, degs=None):
     """
     Returns a dictionary: degree -> count.
     """
-    dist = {}
-    for d in degrees(G):
-        dist[d] = dist.get(d, 0) + 1
-    return dist
+    degs = degrees_array(G) if degs is None else degs
+    counts = np.bincount(degs)
+    present = np.flatnonzero(counts)
+    return dict(zip(present.tolist(), counts[present].tolist()))
 
 
 # ----------------------------
@@ -95,17 +103,17 @@ def print_graph_report(G):
 
     n = num_nodes(G)
     m = num_edges(G)
-    degs = degrees(G)
+    degs = degrees_array(G)
 
     print("========== Graph Metrics ==========")
     print(f"Number of nodes:       {n}")
     print(f"Number of edges:       {m}")
     print(f"Density:               {density(G):.6f}")
     print("")
-    print(f"Min degree:            {min(degs)}")
-    print(f"Max degree:            {max(degs)}")
-    print(f"Average degree:        {sum(degs)/n:.4f}")
-    print(f"Degree std. dev.:      {math.sqrt(sum((d - (sum(degs)/n))**2 for d in degs)/n):.4f}")
+    print(f"Min degree:            {int(degs.min())}")
+    print(f"Max degree:            {int(degs.max())}")
+    print(f"Average degree:        {float(degs.mean()):.4f}")
+    print(f"Degree std. dev.:      {float(degs.std()):.4f}")
     print("")
     print(f"Connected components:  {num_connected_components(G)}")
     print(f"Avg clustering coef.:  {average_clustering_coefficient(G):.6f}")